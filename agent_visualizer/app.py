@@ -1,16 +1,30 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, send_from_directory, abort
+import functools
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import markdown
 
 app = Flask(__name__)
 
+# Shared pool for reading the per-run artifacts in parallel
+_POOL = ThreadPoolExecutor(max_workers=4)
+
 # Path to the runs directory
 RUNS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'runs')
 RUN_ID = 'ae30a38d'  # The run ID from the provided files
 
-def load_json_file(filename):
-    """Load JSON data from a file."""
+def _mtime_ns(filename):
+    """Modification time of a run artifact, or None if it does not exist."""
+    try:
+        return os.stat(os.path.join(RUNS_DIR, filename)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+# Parsed artifacts are cached by (filename, mtime) so an edit on disk invalidates them.
+@functools.lru_cache(maxsize=64)
+def _load_json_cached(filename, mtime_ns):
     try:
         with open(os.path.join(RUNS_DIR, filename), 'r') as f:
             return json.load(f)
@@ -19,38 +33,97 @@ def load_json_file(filename):
     except json.JSONDecodeError:
         return None
 
-def load_text_file(filename):
-    """Load text data from a file."""
+@functools.lru_cache(maxsize=64)
+def _load_text_cached(filename, mtime_ns):
     try:
         with open(os.path.join(RUNS_DIR, filename), 'r') as f:
             return f.read()
     except FileNotFoundError:
         return None
 
+# One Markdown instance (extensions loaded once); reset() between documents.
+# Markdown objects are not thread-safe, so conversions are serialized.
+_MD = markdown.Markdown(extensions=['tables'])
+_MD_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=64)
+def _render_markdown_cached(text):
+    with _MD_LOCK:
+        return _MD.reset().convert(text)
+
+def load_json_file(filename):
+    """Load JSON data from a file."""
+    mtime = _mtime_ns(filename)
+    if mtime is None:
+        return None
+    return _load_json_cached(filename, mtime)
+
+def load_text_file(filename):
+    """Load text data from a file."""
+    mtime = _mtime_ns(filename)
+    if mtime is None:
+        return None
+    return _load_text_cached(filename, mtime)
+
+def render_markdown(text):
+    """Render markdown to HTML, reusing the result for unchanged input."""
+    return _render_markdown_cached(text)
+
+# Artifacts the pipeline pre-renders to HTML at write time, and the file each is rendered from
+HTML_ARTIFACTS = {'macro.notes': 'macro.notes.md', 'factcheck': 'factcheck.json', 'brief': 'brief.md'}
+
+def _fresh_html(stem):
+    """Filename of {stem}.html if it is at least as new as its source, else None.
+    A stale .html (source rewritten after the render) must not shadow the source."""
+    html_name = f'{RUN_ID}.{stem}.html'
+    html_mtime = _mtime_ns(html_name)
+    if html_mtime is None:
+        return None
+    src_mtime = _mtime_ns(f'{RUN_ID}.{HTML_ARTIFACTS[stem]}')
+    if src_mtime is not None and html_mtime < src_mtime:
+        return None
+    return html_name
+
+def render_factcheck(factcheck_data):
+    """Fact-check text as HTML: the fresh pre-render if any, else rendered from the JSON."""
+    html_name = _fresh_html('factcheck')
+    if html_name is not None:
+        return load_text_file(html_name)
+    text = (factcheck_data or {}).get('text', '')
+    return render_markdown(text) if text else text
+
+def load_rendered(stem):
+    """Fresh pre-rendered HTML for a markdown artifact, else render the .md on the fly."""
+    html_name = _fresh_html(stem)
+    if html_name is not None:
+        html = load_text_file(html_name)
+        if html is not None:
+            return html
+    text = load_text_file(f'{RUN_ID}.{stem}.md')
+    return render_markdown(text) if text else text
+
 @app.route('/')
 def index():
-    # Load data for all components
-    sources_data = load_json_file(f'{RUN_ID}.sources.raw.json')
-    macro_notes = load_text_file(f'{RUN_ID}.macro.notes.md')
-    factcheck_data = load_json_file(f'{RUN_ID}.factcheck.json')
-    brief_content = load_text_file(f'{RUN_ID}.brief.md')
-    
-    # Convert markdown to HTML
-    if macro_notes:
-        macro_notes = markdown.markdown(macro_notes, extensions=['tables'])
+    # Load data for all components concurrently; markdown artifacts come back
+    # as HTML (pre-rendered by the pipeline when available)
+    futs = {
+        'sources': _POOL.submit(load_json_file, f'{RUN_ID}.sources.raw.json'),
+        'factcheck': _POOL.submit(load_json_file, f'{RUN_ID}.factcheck.json'),
+        'macro_notes': _POOL.submit(load_rendered, 'macro.notes'),
+        'brief': _POOL.submit(load_rendered, 'brief'),
+    }
+    sources_data = futs['sources'].result()
+    factcheck_data = futs['factcheck'].result()
+    macro_notes = futs['macro_notes'].result()
+    brief_content = futs['brief'].result()
     
     if factcheck_data:
-        factcheck_text = factcheck_data.get('text', '')
         factcheck_flags = factcheck_data.get('flags', [])
-        if factcheck_text:
-            factcheck_text = markdown.markdown(factcheck_text, extensions=['tables'])
+        factcheck_text = render_factcheck(factcheck_data)
     else:
         factcheck_text = None
         factcheck_flags = []
     
-    if brief_content:
-        brief_content = markdown.markdown(brief_content, extensions=['tables'])
-    
     return render_template('index.html',
                          sources=sources_data,
                          macro_notes=macro_notes,
@@ -78,5 +151,39 @@ def api_brief():
     brief_content = load_text_file(f'{RUN_ID}.brief.md')
     return jsonify({'content': brief_content})
 
+@app.route('/api/all')
+def api_all():
+    # All four artifacts in one response to save client round-trips
+    futs = {
+        'sources': _POOL.submit(load_json_file, f'{RUN_ID}.sources.raw.json'),
+        'macro_notes': _POOL.submit(load_text_file, f'{RUN_ID}.macro.notes.md'),
+        'factcheck': _POOL.submit(load_json_file, f'{RUN_ID}.factcheck.json'),
+        'brief': _POOL.submit(load_text_file, f'{RUN_ID}.brief.md'),
+    }
+    return jsonify({
+        'sources': futs['sources'].result() or [],
+        'macro_notes': {'content': futs['macro_notes'].result()},
+        'factcheck': futs['factcheck'].result() or {},
+        'brief': {'content': futs['brief'].result()},
+    })
+
+@app.route('/html/<stem>')
+def html_artifact(stem):
+    # Served straight from disk so conditional GETs and sendfile apply
+    if stem not in HTML_ARTIFACTS:
+        abort(404)
+    html_name = _fresh_html(stem)
+    if html_name is not None:
+        return send_from_directory(RUNS_DIR, html_name)
+    # Missing or stale pre-render: render the current source instead
+    if stem == 'factcheck':
+        html = render_factcheck(load_json_file(f'{RUN_ID}.factcheck.json'))
+    else:
+        html = load_rendered(stem)
+    if html is None:
+        abort(404)
+    return html
+
 if __name__ == '__main__':
+    # Development server only; use `make serve` (gunicorn) for anything else.
     app.run(debug=True, port=5001)
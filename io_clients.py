@@ -1,9 +1,16 @@
 # io_clients.py
 from __future__ import annotations
-import os, json, time, hashlib, logging, random
+import os, time, hashlib, logging, random, atexit, asyncio, functools
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional, Callable
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Callable, Iterator
 import httpx
+import msgspec
+import orjson
+from run_files import atomic_write_bytes
+from run_logging import jlog, iso_now, RUN_FILES, ARTIFACT_WRITER
 
 log = logging.getLogger("fedrate")
 
@@ -12,9 +19,223 @@ CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 # ------------------------- HTTP with cache & retries --------------------------
 
-def _cache_key(provider: str, payload: dict) -> Path:
-    h = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
-    return CACHE_DIR / f"{provider}-{h}.json"
+# Shared, read-only defaults; per-call headers are merged on top by httpx.
+_BASE_HEADERS = MappingProxyType({"User-Agent": "fedrate/1.0", "Accept-Encoding": "gzip, br"})
+
+_CLIENT_KW: dict = dict(
+    timeout=30.0,
+    follow_redirects=True,
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    headers=_BASE_HEADERS,
+)
+
+# One pooled client per process so repeat calls to the same host reuse TCP/TLS.
+_CLIENT = httpx.Client(**_CLIENT_KW)
+atexit.register(_CLIENT.close)
+
+def async_client() -> httpx.AsyncClient:
+    """
+    A pooled AsyncClient with the shared settings. An AsyncClient is bound to the
+    loop it first runs on, so open one per asyncio.run() with `async with` and
+    pass it down as `client=`.
+    """
+    return httpx.AsyncClient(**_CLIENT_KW)
+
+@asynccontextmanager
+async def _aclient_scope(client: httpx.AsyncClient | None):
+    """Yield `client`, or a one-off AsyncClient closed on exit when none is given."""
+    if client is not None:
+        yield client
+        return
+    async with async_client() as c:
+        yield c
+
+# HTTP cache entries are MessagePack; human-facing artifacts stay JSON/Markdown.
+_ENC = msgspec.msgpack.Encoder()
+_DEC = msgspec.msgpack.Decoder()
+
+_RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+_JSON_CT = "application/json"
+
+_RNG = random.Random()
+_BACKOFF_BASE_S = 1.0
+_BACKOFF_CAP_S = 32.0
+
+def _next_backoff(prev: float) -> float:
+    """Capped decorrelated-jitter backoff: next sleep drawn from [base, 3*prev]."""
+    return min(_BACKOFF_CAP_S, _RNG.uniform(_BACKOFF_BASE_S, prev * 3))
+
+def _freeze(obj: Any) -> Any:
+    """
+    Turn a JSON-like payload into a hashable, order-canonical tuple tree.
+    Containers, bools and floats are tagged so values that compare equal in Python
+    but encode differently (1 / True / 1.0, {"a": 1} / [["a", 1]]) never share a key.
+    """
+    if isinstance(obj, dict):
+        return ("d", _freeze_items(obj))
+    if isinstance(obj, (list, tuple)):
+        return ("l", tuple(_freeze(v) for v in obj))
+    if isinstance(obj, (bool, float)):
+        return (type(obj).__name__[0], obj)
+    return obj
+
+def _freeze_items(d: dict) -> tuple:
+    return tuple(sorted((k, _freeze(v)) for k, v in d.items()))
+
+@functools.lru_cache(maxsize=4096)
+def _hashed_key(provider: str, frozen: tuple) -> Path:
+    h = hashlib.blake2b(orjson.dumps(frozen), digest_size=8).hexdigest()
+    return CACHE_DIR / f"{provider}-{h}.msgpack"
+
+# Values _freeze() must tag; anything else (str, int, None) is used as-is.
+_TAGGED = (dict, list, tuple, bool, float)
+
+def _canon(d: dict | None) -> tuple:
+    """_freeze_items() for a params/body dict, with a fast path for flat str/int dicts."""
+    if not d:
+        return ()
+    for v in d.values():
+        if isinstance(v, _TAGGED):
+            return _freeze_items(d)
+    return tuple(sorted(d.items()))
+
+def _cache_key(provider: str, url: str, method: str, params: dict | None, json_body: dict | None) -> Path:
+    # The request's fields in sorted-key order, built without allocating a payload
+    # dict. Warm repeats skip hashing via the LRU.
+    frozen = (("json", _canon(json_body)), ("method", method), ("params", _canon(params)), ("url", url))
+    return _hashed_key(provider, frozen)
+
+# Max cache age per provider in seconds; providers not listed never expire.
+# SERP results go stale quickly; the tool-check probe is a liveness signal, so a
+# probe from the last few minutes stands in for a fresh one.
+PROVIDER_TTL_S: dict[str, float] = {
+    "brave": 6 * 3600,
+    "ddg": 6 * 3600,
+    "httpbin": 5 * 60,
+}
+
+def _read_cache(key: Path, max_age_s: float | None = None) -> dict | None:
+    """
+    Decode a cache entry, or None if absent (or older than max_age_s).
+    An undecodable entry is deleted and treated as a miss.
+    """
+    try:
+        if key.exists():
+            if max_age_s is not None and time.time() - key.stat().st_mtime > max_age_s:
+                jlog(log, event="http_cache_expired", key=key.name, ttl_s=max_age_s)
+                return None
+            return _DEC.decode(key.read_bytes())
+    except msgspec.DecodeError as e:
+        jlog(log, event="http_cache_corrupt", key=key.name, err=str(e), level=logging.WARNING)
+        key.unlink(missing_ok=True)
+    return None
+
+# In-process LRU over idempotent GETs, keyed by cache path: repeat hits skip disk.
+_MEM: "OrderedDict[Path, dict]" = OrderedDict()
+_MEM_MAX = 512
+
+def _mem_get(key: Path) -> dict | None:
+    data = _MEM.get(key)
+    if data is not None:
+        _MEM.move_to_end(key)
+    return data
+
+def _mem_put(key: Path, data: dict) -> None:
+    _MEM[key] = data
+    _MEM.move_to_end(key)
+    if len(_MEM) > _MEM_MAX:
+        _MEM.popitem(last=False)
+
+def _cached(provider: str, url: str, key: Path, *, use_cache: bool, cache_only: bool, memo: bool) -> dict | None:
+    """Return the cached response for `key` if the cache policy allows it, else None."""
+    # 0) in-memory hit (GETs only)
+    if memo and (use_cache or cache_only):
+        data = _mem_get(key)
+        if data is not None:
+            return data
+
+    # 1) cache-only path
+    if cache_only:
+        data = _read_cache(key)
+        if data is not None:
+            if memo:
+                _mem_put(key, data)
+            jlog(log, event="http_cache_hit", provider=provider, key=key.name, mode="cache_only")
+            return data
+        raise FileNotFoundError(f"cache_only: no cache for {provider} {url}")
+
+    # 2) normal path with cache (cache-only replays above ignore TTLs)
+    if use_cache:
+        data = _read_cache(key, PROVIDER_TTL_S.get(provider))
+        if data is not None:
+            if memo:
+                _mem_put(key, data)
+            jlog(log, event="http_cache_hit", provider=provider, key=key.name)
+            return data
+        jlog(log, event="http_cache_miss", provider=provider, key=key.name)
+    return None
+
+# Response validators kept in the cached meta so expired entries can be revalidated.
+_VALIDATORS = (("etag", "If-None-Match"), ("last_modified", "If-Modified-Since"))
+
+def _stale_entry(key: Path, use_cache: bool) -> dict | None:
+    """An expired-but-present cache entry that carries a validator, else None."""
+    if not use_cache:
+        return None
+    data = _read_cache(key)
+    if data is None or not any(f in data.get("meta", {}) for f, _ in _VALIDATORS):
+        return None
+    return data
+
+def _conditional_headers(headers: dict | None, stale: dict | None) -> dict | None:
+    """Add If-None-Match / If-Modified-Since for a stale entry's validators."""
+    if stale is None:
+        return headers
+    meta = stale["meta"]
+    cond = dict(headers or {})
+    for field, header in _VALIDATORS:
+        if field in meta:
+            cond[header] = meta[field]
+    return cond
+
+def _store_response(
+    provider: str, url: str, key: Path, r: httpx.Response, t0: int, *, memo: bool, stale: dict | None = None,
+    cacheable: Callable[[Any], bool] | None = None,
+) -> dict:
+    """
+    Log, validate and cache one HTTP response; raises on retryable/failed statuses.
+    A body rejected by `cacheable` is returned without being written to the cache.
+    """
+    meta = {"status": r.status_code, "ms": (time.perf_counter_ns() - t0) // 1_000_000}
+    jlog(log, event="http_call", provider=provider, meta=meta, url=url)
+    if r.status_code == 304 and stale is not None:
+        # Not modified: keep the stored body and restart its TTL clock.
+        os.utime(key)
+        if memo:
+            _mem_put(key, stale)
+        jlog(log, event="http_not_modified", provider=provider, key=key.name)
+        return stale
+    if r.status_code in _RETRYABLE_STATUSES:
+        raise RuntimeError(f"retryable_status:{r.status_code}")
+    r.raise_for_status()
+    body: Any
+    if _JSON_CT in (r.headers.get("content-type") or ""):
+        body = orjson.loads(r.content)
+    else:
+        body = r.text
+    if etag := r.headers.get("etag"):
+        meta["etag"] = etag
+    if last_modified := r.headers.get("last-modified"):
+        meta["last_modified"] = last_modified
+    data = {"meta": meta, "body": body}
+    if cacheable is not None and not cacheable(body):
+        jlog(log, event="http_not_cached", provider=provider, key=key.name, level=logging.WARNING)
+        return data
+    atomic_write_bytes(key, _ENC.encode(data))
+    if memo:
+        _mem_put(key, data)
+    return data
 
 def fetch(
     provider: str,
@@ -28,50 +249,83 @@ def fetch(
     cache_only: bool = False,
     max_retries: int = 4,
     timeout_s: float = 30.0,
+    cacheable: Callable[[Any], bool] | None = None,
 ) -> dict:
-    payload = {"url": url, "method": method.upper(), "params": params or {}, "json": json_body or {}}
-    key = _cache_key(provider, payload)
-
-    # 1) cache-only path
-    if cache_only:
-        if key.exists():
-            data = json.loads(key.read_text())
-            log.info(json.dumps({"event":"http_cache_hit","provider":provider,"key":key.name,"mode":"cache_only"}))
-            return data
-        raise FileNotFoundError(f"cache_only: no cache for {provider} {url}")
-
-    # 2) normal path with cache
-    if use_cache and key.exists():
-        data = json.loads(key.read_text())
-        log.info(json.dumps({"event":"http_cache_hit","provider":provider,"key":key.name}))
+    method = method.upper()
+    key = _cache_key(provider, url, method, params, json_body)
+    memo = method == "GET"
+    data = _cached(provider, url, key, use_cache=use_cache, cache_only=cache_only, memo=memo)
+    if data is not None:
         return data
+    stale = _stale_entry(key, use_cache)
+    headers = _conditional_headers(headers, stale)
 
-    delay = 1.0
+    delay = _BACKOFF_BASE_S
     for attempt in range(1, max_retries + 1):
-        t0 = time.time()
-        retryable_statuses = {408, 425, 429, 500, 502, 503, 504}
+        t0 = time.perf_counter_ns()
         try:
-            with httpx.Client(timeout=timeout_s, follow_redirects=True) as c:
-                r = c.request(method, url, params=params, json=json_body, headers=headers)
-            meta = {"status": r.status_code, "ms": int((time.time() - t0) * 1000)}
-            log.info(json.dumps({"event":"http_call","provider":provider,"meta":meta,"url":url}))
-            if r.status_code in retryable_statuses:
-                raise RuntimeError(f"retryable_status:{r.status_code}")
-            r.raise_for_status()
-            body: Any
-            if "application/json" in r.headers.get("content-type", ""):
-                body = r.json()
-            else:
-                body = r.text
-            data = {"meta": meta, "body": body}
-            key.write_text(json.dumps(data, indent=2))
-            return data
+            r = _CLIENT.request(method, url, params=params, json=json_body, headers=headers, timeout=timeout_s)
+            return _store_response(provider, url, key, r, t0, memo=memo, stale=stale, cacheable=cacheable)
         except Exception as e:
-            log.warning(json.dumps({"event":"http_retry","provider":provider,"attempt":attempt,"err":str(e)}))
+            jlog(log, event="http_retry", provider=provider, attempt=attempt, err=str(e), level=logging.WARNING)
             if attempt == max_retries:
                 raise
-            time.sleep(delay + random.uniform(0, 0.5))
-            delay *= 2
+            delay = _next_backoff(delay)
+            time.sleep(delay)
+
+async def afetch(
+    provider: str,
+    url: str,
+    method: str = "GET",
+    *,
+    params: dict | None = None,
+    json_body: dict | None = None,
+    headers: dict | None = None,
+    use_cache: bool = True,
+    cache_only: bool = False,
+    max_retries: int = 4,
+    timeout_s: float = 30.0,
+    cacheable: Callable[[Any], bool] | None = None,
+    client: httpx.AsyncClient | None = None,
+) -> dict:
+    """
+    Async twin of fetch(): same cache layout, retries and telemetry.
+    Uses `client` if given (see async_client()), else a one-off client for this call.
+    """
+    method = method.upper()
+    key = _cache_key(provider, url, method, params, json_body)
+    memo = method == "GET"
+    data = _cached(provider, url, key, use_cache=use_cache, cache_only=cache_only, memo=memo)
+    if data is not None:
+        return data
+    stale = _stale_entry(key, use_cache)
+    headers = _conditional_headers(headers, stale)
+
+    delay = _BACKOFF_BASE_S
+    async with _aclient_scope(client) as c:
+        for attempt in range(1, max_retries + 1):
+            t0 = time.perf_counter_ns()
+            try:
+                r = await c.request(method, url, params=params, json=json_body, headers=headers, timeout=timeout_s)
+                return _store_response(provider, url, key, r, t0, memo=memo, stale=stale, cacheable=cacheable)
+            except Exception as e:
+                jlog(log, event="http_retry", provider=provider, attempt=attempt, err=str(e), level=logging.WARNING)
+                if attempt == max_retries:
+                    raise
+                delay = _next_backoff(delay)
+                await asyncio.sleep(delay)
+
+def fetch_many(specs: list[dict]) -> list[dict | BaseException]:
+    """
+    Run several fetches concurrently from sync code.
+    Each spec holds afetch() keyword arguments (must include provider and url).
+    Results come back in spec order; failures are returned as exception objects.
+    """
+    async def _run() -> list[dict | BaseException]:
+        # asyncio.run() gives us a fresh loop, so use a client scoped to it.
+        async with async_client() as c:
+            return await asyncio.gather(*(afetch(**spec, client=c) for spec in specs), return_exceptions=True)
+    return asyncio.run(_run())
 
 # ----------------------------- LLM I/O snapshot ------------------------------
 
@@ -86,9 +340,11 @@ def save_llm_call(
 ) -> Path:
     """
     Persist a complete snapshot of an LLM call.
+    The record is serialized here (so later mutation of `messages` can't leak in)
+    and written by the run's ArtifactWriter thread, off the caller's path.
     """
     record = {
-        "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "ts": iso_now(),
         "run_id": run_id,
         "role": role,
         "provider": provider,
@@ -97,82 +353,110 @@ def save_llm_call(
         "messages": messages,
         "response": response,
     }
-    from run_logging import RUN_FILES  # local import to avoid cycles
     timestamp = int(time.time())
     p = RUN_FILES.macro_analyst_llm(timestamp) if role == "MacroAnalyst" else RUN_FILES.executive_writer_llm(timestamp)
-    p.write_text(json.dumps(record, indent=2))
-    log.info(json.dumps({"event":"llm_saved","role":role,"path":str(p)}))
+    ARTIFACT_WRITER.submit(p, orjson.dumps(record, option=orjson.OPT_INDENT_2))
+    jlog(log, event="llm_saved", role=role, path=str(p))
     return p
 
 # --- JSONL provenance (append-safe) -----------------------------------------
 def sources_jsonl_path():
-    from run_logging import RUN_FILES
     return RUN_FILES.sources_final()
 
-def record_source_jsonl(claim: str, url: str, snippet: str, extra: dict | None = None) -> None:
-    """
-    Append one provenance record as a JSON line. Concurrency-friendly.
-    """
-    import json, time
-    p = sources_jsonl_path()
+def source_record(claim: str, url: str, snippet: str, extra: dict | None = None) -> dict:
+    """Build one provenance record (the JSONL row shape) without writing it."""
     rec = {
-        "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "ts": iso_now(),
         "claim": claim,
         "url": url,
         "snippet": snippet,
     }
     if extra:
         rec.update(extra)
-    with open(p, "a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    return rec
 
-def load_sources_jsonl() -> list[dict]:
+def record_source_jsonl(claim: str, url: str, snippet: str, extra: dict | None = None) -> None:
     """
-    Read all JSONL records as a list (tolerates blank lines).
+    Append one provenance record as a JSON line. Concurrency-friendly.
+    """
+    record_sources_jsonl([source_record(claim, url, snippet, extra)])
+
+def record_sources_jsonl(records: list[dict]) -> int:
+    """
+    Append many provenance records (see source_record) with a single write.
+    The file is opened O_APPEND, so the batch lands contiguously. Returns the count.
+    """
+    if not records:
+        return 0
+    buf = b"".join(orjson.dumps(rec, option=orjson.OPT_APPEND_NEWLINE) for rec in records)
+    with open(sources_jsonl_path(), "ab") as f:
+        f.write(buf)
+    return len(records)
+
+def iter_sources_jsonl() -> Iterator[dict]:
+    """
+    Stream JSONL records one at a time (tolerates blank lines).
+    A truncated trailing line from an interrupted append is skipped.
     """
     p = sources_jsonl_path()
-    items: list[dict] = []
     if not p.exists():
-        return items
-    with open(p, "r", encoding="utf-8") as f:
+        return
+    with open(p, "rb") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             try:
-                items.append(json.loads(line))
-            except Exception:
-                # Optionally log/skip bad line
-                pass
-    return items
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
+                jlog(log, event="sources_bad_line", path=str(p), level=logging.WARNING)
 
+def load_sources_jsonl() -> list[dict]:
+    """
+    Read all JSONL records as a list (tolerates blank lines).
+    """
+    return list(iter_sources_jsonl())
 
-def openrouter_chat(
+
+@functools.lru_cache(maxsize=4)
+def _openrouter_headers(key: str) -> MappingProxyType:
+    # Built once per API key; read-only so callers can't mutate the shared copy.
+    return MappingProxyType({
+        "Authorization": f"Bearer {key}",
+        "Content-Type": "application/json",
+        # Optional but nice:
+        # "HTTP-Referer": "https://your-app.example", 
+        # "X-Title": "fedrate",
+    })
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Finish reasons that mean the model completed normally; anything else is not cached.
+_CLEAN_FINISH = frozenset({"stop", "length"})
+
+def _openrouter_cacheable(body: Any) -> bool:
+    """Only cache a completion body: no error, at least one choice, a clean finish_reason."""
+    if not isinstance(body, dict) or "error" in body:
+        return False
+    choices = body.get("choices")
+    return bool(choices) and choices[0].get("finish_reason") in _CLEAN_FINISH
+
+def _openrouter_request(
     messages: list[dict],
     *,
     model: str,
-    temperature: float = 0.0,
-    top_p: float = 1.0,
-    seed: int | None = None,
-    max_tokens: int | None = None,
-    timeout_s: float = 60.0,
+    temperature: float,
+    top_p: float,
+    seed: int | None,
+    max_tokens: int | None,
+    timeout_s: float,
+    use_cache: bool,
 ) -> dict:
-    """
-    Call OpenRouter's /chat/completions with OpenAI-compatible payload.
-    Returns the raw JSON response.
-    """
-    import os
+    """Build the fetch()/afetch() arguments for one chat completion."""
     key = os.getenv("OPENROUTER_API_KEY", "")
     if not key:
         raise RuntimeError("OPENROUTER_API_KEY is not set")
 
-    headers = {
-        "Authorization": f"Bearer {key}",
-        "Content-Type": "application/json",
-        # Optional but nice:
-        # "HTTP-Referer": "https://your-app.example", 
-        # "X-Title": "fedrate",
-    }
     payload = {
         "model": model,
         "messages": messages,
@@ -184,13 +468,174 @@ def openrouter_chat(
     if max_tokens is not None:
         payload["max_tokens"] = max_tokens
 
-    # Use our fetch() so we get retries/telemetry; don't cache LLM outputs
-    return fetch(
-        "openrouter",
-        "https://openrouter.ai/api/v1/chat/completions",
+    # Use our fetch() so we get retries/telemetry. The cache key covers the whole
+    # payload (model, messages, sampling params), so only reuse a response when
+    # the call is reproducible: greedy decoding or a fixed seed.
+    deterministic = temperature == 0 or seed is not None
+    return dict(
+        provider="openrouter",
+        url=OPENROUTER_URL,
         method="POST",
         json_body=payload,
-        headers=headers,
-        use_cache=False,
+        headers=_openrouter_headers(key),
+        use_cache=use_cache and deterministic,
         timeout_s=timeout_s,
+        cacheable=_openrouter_cacheable,
+    )
+
+def openrouter_chat(
+    messages: list[dict],
+    *,
+    model: str,
+    temperature: float = 0.0,
+    top_p: float = 1.0,
+    seed: int | None = None,
+    max_tokens: int | None = None,
+    timeout_s: float = 60.0,
+    use_cache: bool = True,
+) -> dict:
+    """
+    Call OpenRouter's /chat/completions with OpenAI-compatible payload.
+    Returns the raw JSON response. Deterministic calls (temperature 0 or a
+    fixed seed) are served from the fetch() cache unless use_cache=False.
+    """
+    return fetch(**_openrouter_request(
+        messages, model=model, temperature=temperature, top_p=top_p,
+        seed=seed, max_tokens=max_tokens, timeout_s=timeout_s, use_cache=use_cache,
+    ))
+
+async def aopenrouter_chat(
+    messages: list[dict],
+    *,
+    model: str,
+    temperature: float = 0.0,
+    top_p: float = 1.0,
+    seed: int | None = None,
+    max_tokens: int | None = None,
+    timeout_s: float = 60.0,
+    use_cache: bool = True,
+    client: httpx.AsyncClient | None = None,
+) -> dict:
+    """
+    Async openrouter_chat(): same payload and response, via afetch(client=client).
+    """
+    return await afetch(**_openrouter_request(
+        messages, model=model, temperature=temperature, top_p=top_p,
+        seed=seed, max_tokens=max_tokens, timeout_s=timeout_s, use_cache=use_cache,
+    ), client=client)
+
+async def aopenrouter_chat_stream(
+    messages: list[dict],
+    *,
+    model: str,
+    temperature: float = 0.0,
+    top_p: float = 1.0,
+    seed: int | None = None,
+    max_tokens: int | None = None,
+    timeout_s: float = 60.0,
+    use_cache: bool = True,
+    max_retries: int = 4,
+    on_delta: Callable[[str], None] | None = None,
+    client: httpx.AsyncClient | None = None,
+) -> dict:
+    """
+    Streaming aopenrouter_chat(): reads the SSE response and calls on_delta(text)
+    for each content chunk as it arrives, so callers can persist partial output.
+    Returns the same {"meta", "body"} shape as the non-streaming call, and shares
+    its cache entry (a cache hit is delivered as a single delta).
+    Only a clean completion ([DONE] seen, no error event, finish_reason stop or
+    length) is cached; anything else raises.
+    """
+    req = _openrouter_request(
+        messages, model=model, temperature=temperature, top_p=top_p,
+        seed=seed, max_tokens=max_tokens, timeout_s=timeout_s, use_cache=use_cache,
     )
+    provider, url, payload = req["provider"], req["url"], req["json_body"]
+    key = _cache_key(provider, url, "POST", None, payload)
+    data = _cached(provider, url, key, use_cache=req["use_cache"], cache_only=False, memo=False)
+    if data is not None:
+        if on_delta is not None:
+            choices = data.get("body", {}).get("choices") or [{}]
+            on_delta(choices[0].get("message", {}).get("content") or "")
+        return data
+
+    parts: list[str] = []
+    last: dict = {}
+    finish_reason = None
+    delay = _BACKOFF_BASE_S
+    async with _aclient_scope(client) as c:
+        for attempt in range(1, max_retries + 1):
+            t0 = time.perf_counter_ns()
+            done = False
+            try:
+                async with c.stream(
+                    "POST", url, json={**payload, "stream": True}, headers=req["headers"], timeout=timeout_s,
+                ) as r:
+                    if r.status_code in _RETRYABLE_STATUSES:
+                        raise RuntimeError(f"retryable_status:{r.status_code}")
+                    r.raise_for_status()
+                    async for line in r.aiter_lines():
+                        # SSE: "data: {...}" events; ":"-prefixed lines are keep-alive comments
+                        if not line.startswith("data: "):
+                            continue
+                        chunk = line[6:]
+                        if chunk == "[DONE]":
+                            done = True
+                            break
+                        last = orjson.loads(chunk)
+                        if "error" in last:
+                            raise RuntimeError(f"stream_error:{last['error']}")
+                        choice = (last.get("choices") or [{}])[0]
+                        finish_reason = choice.get("finish_reason") or finish_reason
+                        text = (choice.get("delta") or {}).get("content")
+                        if text:
+                            parts.append(text)
+                            if on_delta is not None:
+                                on_delta(text)
+                if not done:
+                    raise RuntimeError("stream_incomplete: closed before [DONE]")
+                if finish_reason not in _CLEAN_FINISH:
+                    raise RuntimeError(f"stream_unfinished:{finish_reason}")
+                break
+            except Exception as e:
+                jlog(log, event="http_retry", provider=provider, attempt=attempt, err=str(e), level=logging.WARNING)
+                # once tokens have been handed to the caller a retry would duplicate them
+                if parts or attempt == max_retries:
+                    raise
+                delay = _next_backoff(delay)
+                await asyncio.sleep(delay)
+
+    meta = {"status": r.status_code, "ms": (time.perf_counter_ns() - t0) // 1_000_000, "stream": True}
+    jlog(log, event="http_call", provider=provider, meta=meta, url=url)
+    body = {
+        "id": last.get("id"),
+        "model": last.get("model", model),
+        "choices": [{"message": {"role": "assistant", "content": "".join(parts)}, "finish_reason": finish_reason}],
+        "usage": last.get("usage", {}),
+    }
+    data = {"meta": meta, "body": body}
+    atomic_write_bytes(key, _ENC.encode(data))
+    return data
+
+class LLMBatcher:
+    """
+    Shared concurrency gate for LLM calls.
+    Callers submit via `await batcher.chat(...)`; at most `max_concurrent` requests
+    are in flight, which keeps fan-out under provider (e.g. free-tier) rate limits.
+    429s are retried with backoff inside afetch().
+    Create one per event loop (e.g. inside the coroutine asyncio.run() drives),
+    like async_client(), rather than at import time.
+    """
+    def __init__(self, max_concurrent: int = 4):
+        self.max_concurrent = int(max_concurrent)
+        self._sem = asyncio.Semaphore(self.max_concurrent)
+
+    async def chat(self, messages: list[dict], **kwargs) -> dict:
+        """Same arguments and return value as aopenrouter_chat()."""
+        async with self._sem:
+            return await aopenrouter_chat(messages, **kwargs)
+
+    async def chat_stream(self, messages: list[dict], **kwargs) -> dict:
+        """Same arguments and return value as aopenrouter_chat_stream()."""
+        async with self._sem:
+            return await aopenrouter_chat_stream(messages, **kwargs)
@@ -8,7 +8,7 @@ A trimmed, monitoring-first rewrite of your research workflow that wires in:
   - Per-run manifest + artifacts
   - HTTP client with caching/retries (via io_clients.fetch)
   - LLM prompt/response snapshotting (via io_clients.save_llm_call)
-  - Source/citation recorder (via io_clients.record_source_jsonl)
+  - Source/citation recorder (via serp_utils.SerpRecorder → io_clients.record_sources_jsonl)
   - Deterministic date handling with FEDRATE_TODAY or --today
 
 This keeps your three-agent shape (Macro Analyst → Fact Checker → Executive Writer)
@@ -30,36 +30,48 @@ Notes:
 """
 
 import os
-import json
+import re
+import sys
+import logging
 import time
+import asyncio
 import argparse
+import functools
+from collections import OrderedDict
 from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Any, Dict, List, Optional
 
+import httpx
+import orjson
+
 # ---- Monitoring & I/O hooks -------------------------------------------------
 from run_logging import (
     init_logging,
+    jlog,
     write_manifest,
     timed_span,
+    save_html_render,
+    ARTIFACT_WRITER,
     RUN_ID,
+    RUN_FILES,
     get_today,
 )
-from run_files import RunFiles
-from io_clients import fetch, save_llm_call, record_source_jsonl, load_sources_jsonl, openrouter_chat
+from io_clients import fetch, afetch, async_client, save_llm_call, load_sources_jsonl, LLMBatcher
+from serp_utils import SerpRecorder
 
 
 log = init_logging()
 write_manifest()
 
-# Create RunFiles instance
-from run_logging import ART_DIR
-RUN_FILES = RunFiles(RUN_ID, ART_DIR)
-
 # ---- Model constants --------------------------------------------------------
 ANALYST_MODEL   = "z-ai/glm-4.5-air:free"
 FACTCHECK_MODEL = "moonshotai/kimi-k2:free"
 WRITER_MODEL    = "openai/gpt-oss-20b:free"
 
+# Max in-flight LLM calls; run_pipeline builds one LLMBatcher per event loop with it
+LLM_CONCURRENCY = int(os.getenv("FEDRATE_LLM_CONCURRENCY", 4))
+
 
 # ---- Config -----------------------------------------------------------------
 @dataclass
@@ -70,6 +82,9 @@ class CliConfig:
     seed: Optional[int]
     cache_only: bool
     stub: bool
+    llm_cache: bool
+    stream: bool
+    force_probe: bool
 
 
 def parse_args() -> CliConfig:
@@ -80,6 +95,9 @@ def parse_args() -> CliConfig:
     p.add_argument("--seed", type=int, default=os.getenv("FEDRATE_SEED"), nargs="?", help="LLM seed if supported")
     p.add_argument("--cache-only", action="store_true", help="Serve HTTP from cache if available (still writes cache on miss)")
     p.add_argument("--stub", action="store_true", help="Use stub responses instead of calling real models")
+    p.add_argument("--no-llm-cache", action="store_true", help="Always call the LLM, even for reproducible (temperature 0 / seeded) prompts")
+    p.add_argument("--no-stream", action="store_true", help="Wait for full LLM completions instead of streaming notes/brief to disk")
+    p.add_argument("--force-probe", action="store_true", help="Always hit httpbin in the tool check, even if a recent probe is cached")
     args = p.parse_args()
     today = get_today(args.today)
     return CliConfig(
@@ -89,73 +107,118 @@ def parse_args() -> CliConfig:
         seed=(int(args.seed) if args.seed is not None else None),
         cache_only=bool(args.cache_only),
         stub=args.stub,
+        llm_cache=not args.no_llm_cache,
+        stream=not args.no_stream,
+        force_probe=args.force_probe,
     )
 
 
 # ---- Environment / Tool checks ---------------------------------------------
+_PY_VERSION = sys.version.split()[0]
+
+
 def environment_check() -> None:
-    log.info(json.dumps({"event": "env_check", "python": os.sys.version.split()[0]}))
+    jlog(log, event="env_check", python=_PY_VERSION)
 
 
 def test_tool_availability(cfg: CliConfig) -> None:
     log.info("Testing tool availability...")
-    # Example: hit a simple, harmless endpoint to verify HTTP works + cache
+    # Example: hit a simple, harmless endpoint to verify HTTP works + cache.
+    # Params are run-independent so a probe cached within the httpbin TTL is reused.
     try:
         r = fetch(
             "httpbin",
             "https://httpbin.org/get",
-            params={"ping": "pong", "run": RUN_ID},
-            use_cache=not cfg.cache_only,  # allow cache unless --cache-only explicitly requested
+            params={"ping": "pong"},
+            # allow cache unless --cache-only or --force-probe explicitly requested
+            use_cache=not (cfg.cache_only or cfg.force_probe),
         )
         if isinstance(r.get("body"), dict):
             log.info("✅ HTTP client available")
         else:
             log.warning("HTTP client returned non-JSON body")
     except Exception as e:
-        log.error(json.dumps({"event": "tool_test_failed", "tool": "httpbin", "err": str(e)}))
+        jlog(log, event="tool_test_failed", tool="httpbin", err=str(e), level=logging.ERROR)
 
 
 # ---- Search helpers ---------------------------------------------------------
-def search_with_fallback(query: str, cfg: CliConfig) -> List[Dict[str, Any]]:
+# In-process results per (normalized query, cache_only), so repeated or
+# near-duplicate queries in one run skip the provider round-trip entirely.
+_SEARCH_MEMO: "OrderedDict[tuple[str, bool], List[Dict[str, Any]]]" = OrderedDict()
+_SEARCH_MEMO_MAX = 128
+
+# Brave wraps query-term matches in <strong>…</strong>; strip both tags in one pass
+_STRONG_RE = re.compile(r"</?strong>")
+
+# Provider rotation order and the per-provider constant headers; only params vary per query.
+_SEARCH_PROVIDERS = (
+    ("brave", "https://api.search.brave.com/res/v1/web/search"),  # Brave JSON API
+    ("ddg",  "https://html.duckduckgo.com/html"),                 # DDG HTML endpoint
+)
+_DDG_HEADERS = MappingProxyType({"User-Agent": "Mozilla/5.0"})
+
+
+@functools.lru_cache(maxsize=4)
+def _brave_headers(key: str) -> MappingProxyType:
+    # Brave authenticates with X-Subscription-Token rather than Authorization. The key
+    # is re-read from BRAVE_API_KEY per search, so a rotated key just adds an entry here.
+    return MappingProxyType({
+        "User-Agent": "fedrate/1.0",
+        "Accept": "application/json",
+        "X-Subscription-Token": key,
+    })
+
+
+async def search_with_fallback(query: str, cfg: CliConfig, client: httpx.AsyncClient | None = None) -> List[Dict[str, Any]]:
+    """search_with_fallback_uncached() behind an LRU keyed by normalized query."""
+    key = (" ".join(query.lower().split()), cfg.cache_only)
+    hit = _SEARCH_MEMO.get(key)
+    if hit is not None:
+        _SEARCH_MEMO.move_to_end(key)
+        jlog(log, event="search_memo_hit", q=query)
+        return [dict(r) for r in hit]
+
+    results = await search_with_fallback_uncached(query, cfg, client)
+    if results:  # don't pin a run to an all-providers-failed answer
+        _SEARCH_MEMO[key] = [dict(r) for r in results]
+        if len(_SEARCH_MEMO) > _SEARCH_MEMO_MAX:
+            _SEARCH_MEMO.popitem(last=False)
+    return results
+
+
+async def search_with_fallback_uncached(query: str, cfg: CliConfig, client: httpx.AsyncClient | None = None) -> List[Dict[str, Any]]:
     """Minimal example search with provider rotation and caching.
     Replace URLs with your real search providers.
     """
-    providers = [
-        ("brave", "https://api.search.brave.com/res/v1/web/search"),  # Brave JSON API
-        ("ddg",  "https://html.duckduckgo.com/html"),                 # DDG HTML endpoint
-    ]
-
-    headers = {"User-Agent": "Mozilla/5.0 (compatible; fedrate/1.0)"}
-
-    for provider, url in providers:
+    for provider, url in _SEARCH_PROVIDERS:
         try:
             if provider == "brave":
-                # Brave expects an API key in Authorization
-                headers = {
-                    "User-Agent": "fedrate/1.0",
-                    "Accept": "application/json",
-                    "X-Subscription-Token": os.getenv("BRAVE_API_KEY", "")
-                }
+                headers = _brave_headers(os.getenv("BRAVE_API_KEY", ""))
                 params = {"q": query, "count": 5}
             else:  # ddg
-                headers = {"User-Agent": "Mozilla/5.0"}
+                headers = _DDG_HEADERS
                 params = {"q": query}
 
-            res = fetch(provider, url, params=params,
-                        headers=headers,
-                        use_cache=True,
-                        cache_only=cfg.cache_only)
+            res = await afetch(provider, url, params=params,
+                               headers=headers,
+                               use_cache=True,
+                               cache_only=cfg.cache_only,
+                               client=client)
 
             body = res.get("body")
-            if provider == "brave" and isinstance(body, dict):
+            if provider == "brave":
+                if not isinstance(body, dict):
+                    # e.g. an HTML error page; fall through to the next provider
+                    raise ValueError(f"non-JSON body ({type(body).__name__})")
+                strip = _STRONG_RE.sub
                 results = [
                     {
                         "title": it.get("title") or "",
                         "url": it.get("url") or "",
-                        "snippet": (it.get("description") or "").replace("<strong>","").replace("</strong>",""),
+                        "snippet": strip("", it.get("description") or ""),
                         "provider": "brave",
                     }
-                    for it in body.get("web", {}).get("results", [])
+                    for it in (body.get("web") or {}).get("results") or ()
                 ]
             else:
                 # still stub parse for DDG
@@ -166,37 +229,34 @@ def search_with_fallback(query: str, cfg: CliConfig) -> List[Dict[str, Any]]:
                     "provider": "ddg",
                 }]
 
-            log.info(json.dumps({"event": "search_ok", "provider": provider, "q": query}))
+            jlog(log, event="search_ok", provider=provider, q=query)
             return results
 
         except Exception as e:
-            log.warning(json.dumps({"event": "search_fail", "provider": provider, "q": query, "err": str(e)}))
+            jlog(log, event="search_fail", provider=provider, q=query, err=str(e), level=logging.WARNING)
             continue
     return []
 
 
-# ---- Agent: Macro Analyst ---------------------------------------------------
-TOP_SERP_PER_QUERY = 6  # tune as you like
+# ---- LLM helpers ------------------------------------------------------------
+async def chat_streamed_to(llm: LLMBatcher, path, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+    """Stream an LLM reply into `path` as it is generated, so partial output is
+    inspectable mid-run. The caller still writes the final text afterwards."""
+    with open(path, "w", encoding="utf-8") as f:
+        def on_delta(text: str) -> None:
+            f.write(text)
+            f.flush()
+        return await llm.chat_stream(messages, on_delta=on_delta, **kwargs)
 
-def macro_analyst(cfg: CliConfig) -> Dict[str, Any]:
-    with timed_span("MacroAnalyst"):
-        q1 = f"Federal Reserve FOMC Jackson Hole meeting July 30, 2025"
-        q2 = "Jerome Powell Fed funds rate July 30, 2025"
-        from serp_utils import SerpRecorder
-        # record up to K per query, but never exceed run_cap across all queries
-        rec = SerpRecorder(top_k_per_query=TOP_SERP_PER_QUERY, run_cap=20)
-
-        for query in (q1, q2):
-            res = search_with_fallback(query, cfg)  # make sure each item has title/url/snippet/provider
-            _ = rec.record_query_results(res, query=query)  # returns how many it recorded for this query
 
-        results = rec.all_results  # unique results across queries (in the order recorded)
+# ---- Agent: Macro Analyst ---------------------------------------------------
+TOP_SERP_PER_QUERY = 6  # tune as you like
 
-        # Build RAG prompt using exactly what we recorded
-        ## sources_block = rec.context_block(max_items=8)
-        # We should ideally use the SERP and scraping to populate the following. However, for the purposes of a demo,
-        # Hard code this content for now.
-        sources_block = """
+# Static prompt pieces, built once at import so the prompt bytes (and thus the
+# LLM cache key) are stable across calls; only the date is filled in per run.
+# We should ideally use the SERP and scraping to populate the following. However, for the purposes of a demo,
+# Hard code this content for now.
+ANALYST_SOURCES_BLOCK = """
 - Today’s Date:
   - August 24, 2025
 
@@ -243,27 +303,46 @@ def macro_analyst(cfg: CliConfig) -> Dict[str, Any]:
   - Wall Street Journal: Minutes show broad support for hold, inflation concerns dominate, markets eye September cut  
     https://www.wsj.com/economy/central-banking/fed-minutes-july-meeting-ec9ab128
         """
+
+ANALYST_SYSTEM_MSG = {
+    "role": "system",
+    "content": (
+        "You are a macro analyst. Use ONLY the sources provided under the 'Context' section. "
+        "Do NOT mention training data or knowledge cutoff. If the context is insufficient to answer, "
+        "respond with EXACTLY: INSUFFICIENT_SOURCES."
+    ),
+}
+
+ANALYST_USER_HEAD = (
+    "Task: Summarize the Federal Reserve's current policy stance as of {today}.\n\n"
+    "Output:\n"
+    "1) One-paragraph bottom line.\n"
+    "2) 3-5 bullet drivers (inflation, labor, growth, financial conditions).\n"
+    "3) Cite sources inline with [#] indices that match the Context list.\n\n"
+    "Context:\n"
+)
+
+async def macro_analyst(cfg: CliConfig, llm: LLMBatcher, client: httpx.AsyncClient | None = None) -> Dict[str, Any]:
+    with timed_span("MacroAnalyst"):
+        q1 = f"Federal Reserve FOMC Jackson Hole meeting July 30, 2025"
+        q2 = "Jerome Powell Fed funds rate July 30, 2025"
+        # record up to K per query, but never exceed run_cap across all queries
+        rec = SerpRecorder(top_k_per_query=TOP_SERP_PER_QUERY, run_cap=20)
+
+        # the queries are independent: run them concurrently, then record in query order
+        queries = (q1, q2)
+        all_res = await asyncio.gather(*(search_with_fallback(q, cfg, client) for q in queries))
+        for query, res in zip(queries, all_res):  # make sure each item has title/url/snippet/provider
+            _ = rec.record_query_results(res, query=query)  # returns how many it recorded for this query
+
+        results = rec.all_results  # unique results across queries (in the order recorded)
+
+        # Build RAG prompt using exactly what we recorded
+        ## sources_block = rec.context_block(max_items=8)
+        # For the demo the context is the hard-coded ANALYST_SOURCES_BLOCK (see above).
         messages = [
-            {
-                "role": "system",
-                "content": (
-                    "You are a macro analyst. Use ONLY the sources provided under the 'Context' section. "
-                    "Do NOT mention training data or knowledge cutoff. If the context is insufficient to answer, "
-                    "respond with EXACTLY: INSUFFICIENT_SOURCES."
-                ),
-            },
-            {
-                "role": "user",
-                "content": (
-                    f"Task: Summarize the Federal Reserve's current policy stance as of {cfg.today}.\n\n"
-                    "Output:\n"
-                    "1) One-paragraph bottom line.\n"
-                    "2) 3-5 bullet drivers (inflation, labor, growth, financial conditions).\n"
-                    "3) Cite sources inline with [#] indices that match the Context list.\n\n"
-                    "Context:\n"
-                    f"{sources_block}"
-                ),
-            },
+            ANALYST_SYSTEM_MSG,
+            {"role": "user", "content": ANALYST_USER_HEAD.format(today=cfg.today) + ANALYST_SOURCES_BLOCK},
         ]
         # --- LLM client call goes here ---
         if cfg.stub:
@@ -272,14 +351,29 @@ def macro_analyst(cfg: CliConfig) -> Dict[str, Any]:
                 "choices": [{"message": {"role": "assistant", "content": "Analyst notes (stub)."}, "finish_reason": "stop"}],
                 "usage": {"prompt_tokens": 0, "completion_tokens": 0},
             }
+        elif cfg.stream:
+            resp = await chat_streamed_to(
+                llm,
+                RUN_FILES.macro_notes(),
+                messages,
+                model=ANALYST_MODEL,
+                temperature=cfg.temperature,
+                top_p=cfg.top_p,
+                seed=cfg.seed,
+                max_tokens=3000,
+                use_cache=cfg.llm_cache,
+                client=client,
+            )
         else:
-            resp = openrouter_chat(
+            resp = await llm.chat(
                 messages,
                 model=ANALYST_MODEL,
                 temperature=cfg.temperature,
                 top_p=cfg.top_p,
                 seed=cfg.seed,
                 max_tokens=3000,
+                use_cache=cfg.llm_cache,
+                client=client,
             )
 
         save_llm_call(
@@ -300,15 +394,15 @@ def macro_analyst(cfg: CliConfig) -> Dict[str, Any]:
         analyst_text = choices[0]["message"]["content"] if choices else "(no content)"
 
         macro_notes_path = RUN_FILES.macro_notes()
-        macro_notes_path.write_text(analyst_text)
-        log.info(json.dumps({"event":"artifact_saved","name":"macro.notes.md","path":str(macro_notes_path)}))
+        ARTIFACT_WRITER.submit(macro_notes_path, analyst_text)
+        jlog(log, event="artifact_saved", name="macro.notes.md", path=str(macro_notes_path))
+        save_html_render(RUN_FILES.macro_notes_html(), analyst_text)
         return {"notes": analyst_text, "search": results}
 
 
 # ---- Source utilities -------------------------------------------------------
-def load_and_format_sources() -> str:
-    """Load collected sources and format them for fact checking."""
-    sources = load_sources_jsonl()
+def format_sources(sources: list) -> str:
+    """Format collected sources for fact checking."""
     if not sources:
         return "No sources collected."
     
@@ -346,10 +440,13 @@ def assess_source_completeness(analyst_notes: str, sources: list) -> list:
     return ["sources_incomplete"]
 
 # ---- Agent: Fact Checker ----------------------------------------------------
-def fact_checker(cfg: CliConfig, analyst: Dict[str, Any]) -> Dict[str, Any]:
+async def fact_checker(
+    cfg: CliConfig, analyst: Dict[str, Any], llm: LLMBatcher, client: httpx.AsyncClient | None = None,
+) -> Dict[str, Any]:
     with timed_span("FactChecker"):
-        # Load and format collected sources
-        sources_text = load_and_format_sources()
+        # Load collected sources once; used for the prompt and the completeness check
+        sources = load_sources_jsonl()
+        sources_text = format_sources(sources)
         
         # Create enhanced fact checker prompt with sources
         messages = [
@@ -381,13 +478,15 @@ def fact_checker(cfg: CliConfig, analyst: Dict[str, Any]) -> Dict[str, Any]:
                 "usage": {"prompt_tokens": 0, "completion_tokens": 0},
             }
         else:
-            resp = openrouter_chat(
+            resp = await llm.chat(
                 messages,
                 model=FACTCHECK_MODEL,
                 temperature=cfg.temperature,
                 top_p=cfg.top_p,
                 seed=cfg.seed,
                 max_tokens=1200,  # Increased token limit for more detailed response
+                use_cache=cfg.llm_cache,
+                client=client,
             )
         
         # Extract text
@@ -396,28 +495,29 @@ def fact_checker(cfg: CliConfig, analyst: Dict[str, Any]) -> Dict[str, Any]:
         fact_checker_text = choices[0]["message"]["content"] if choices else "(no content)"
         
         # Assess source completeness
-        sources = load_sources_jsonl()
         flags = assess_source_completeness(analyst['notes'], sources)
         
         factcheck_path = RUN_FILES.factcheck()
-        factcheck_path.write_text(json.dumps({"text": fact_checker_text, "flags": flags}, indent=2))
-        log.info(json.dumps({"event":"artifact_saved","name":"factcheck.json","path":str(factcheck_path)}))
-        return {"text": fact_checker_text, "flags": flags}
+        ARTIFACT_WRITER.submit(factcheck_path, orjson.dumps({"text": fact_checker_text, "flags": flags}, option=orjson.OPT_INDENT_2))
+        jlog(log, event="artifact_saved", name="factcheck.json", path=str(factcheck_path))
+        save_html_render(RUN_FILES.factcheck_html(), fact_checker_text)
+        return {"text": fact_checker_text, "flags": flags, "sources": sources}
 
 
 # ---- Agent: Executive Writer ------------------------------------------------
-def executive_writer(cfg: CliConfig, analyst: Dict[str, Any], fact: Dict[str, Any]) -> str:
-    from io_clients import openrouter_chat  # ensure it's imported
-
+async def executive_writer(
+    cfg: CliConfig, analyst: Dict[str, Any], fact: Dict[str, Any], llm: LLMBatcher,
+    client: httpx.AsyncClient | None = None,
+) -> str:
     with timed_span("ExecutiveWriter"):
         messages = [
             {"role": "system", "content": "You write concise executive briefs with a methodology box."},
-            {"role": "user", "content": json.dumps({
+            {"role": "user", "content": orjson.dumps({
                 "date": cfg.today,
                 "analyst": analyst.get("notes"),
                 "fact": fact.get("text"),
                 "flags": fact.get("flags", []),
-            })},
+            }).decode()},
         ]
 
         if cfg.stub:
@@ -439,14 +539,30 @@ def executive_writer(cfg: CliConfig, analyst: Dict[str, Any], fact: Dict[str, An
                 "usage": {"prompt_tokens": 0, "completion_tokens": 0},
             }
             provider_used = "stub"
+        elif cfg.stream:
+            resp = await chat_streamed_to(
+                llm,
+                RUN_FILES.brief(),
+                messages,
+                model=WRITER_MODEL,
+                temperature=cfg.temperature,
+                top_p=cfg.top_p,
+                seed=cfg.seed,
+                max_tokens=1200,
+                use_cache=cfg.llm_cache,
+                client=client,
+            )
+            provider_used = "openrouter"
         else:
-            resp = openrouter_chat(
+            resp = await llm.chat(
                 messages,
                 model=WRITER_MODEL,
                 temperature=cfg.temperature,
                 top_p=cfg.top_p,
                 seed=cfg.seed,
                 max_tokens=1200,
+                use_cache=cfg.llm_cache,
+                client=client,
             )
             provider_used = "openrouter"
 
@@ -469,54 +585,62 @@ def executive_writer(cfg: CliConfig, analyst: Dict[str, Any], fact: Dict[str, An
         brief_text = choices[0]["message"]["content"] if choices else "(no content)"
 
         brief_path = RUN_FILES.brief()
-        brief_path.write_text(brief_text)
-        log.info(json.dumps({"event":"artifact_saved","name":"brief.md","path":str(brief_path)}))
+        ARTIFACT_WRITER.submit(brief_path, brief_text)
+        jlog(log, event="artifact_saved", name="brief.md", path=str(brief_path))
+        save_html_render(RUN_FILES.brief_html(), brief_text)
         return brief_text
 
 
 # ---- Main -------------------------------------------------------------------
+async def run_pipeline(cfg: CliConfig) -> tuple[Dict[str, Any], Dict[str, Any], str]:
+    """Macro Analyst → Fact Checker → Executive Writer; each stage awaits the previous one.
+    All stages share one AsyncClient and one LLMBatcher (shared rate-limit gate),
+    both created inside this event loop; the client is closed with it."""
+    llm = LLMBatcher(max_concurrent=LLM_CONCURRENCY)
+    async with async_client() as client:
+        analyst = await macro_analyst(cfg, llm, client)
+        fact = await fact_checker(cfg, analyst, llm, client)
+        brief = await executive_writer(cfg, analyst, fact, llm, client)
+    return analyst, fact, brief
+
+
 def main() -> int:
     cfg = parse_args()
-    log.info(json.dumps({"event": "start", "run_id": RUN_ID, "today": cfg.today}))
+    jlog(log, event="start", run_id=RUN_ID, today=cfg.today)
 
     environment_check()
     test_tool_availability(cfg)
 
     try:
         with timed_span("Pipeline"):
-            analyst = macro_analyst(cfg)
-            sources_path = RUN_FILES.sources_raw()
-            fact = fact_checker(cfg, analyst)
-            brief = executive_writer(cfg, analyst, fact)
+            analyst, fact, brief = asyncio.run(run_pipeline(cfg))
     except Exception as e:
-        log.error(json.dumps({"event": "pipeline_failed", "err": str(e)}))
+        jlog(log, event="pipeline_failed", err=str(e), level=logging.ERROR)
+        return 1
+    finally:
+        write_failures = ARTIFACT_WRITER.flush()  # stage artifacts are written in the background
+    if write_failures:
+        jlog(log, event="pipeline_failed", err="artifact write failed",
+             paths=[str(p) for p, _ in write_failures], level=logging.ERROR)
         return 1
 
-    # Summarize debug info
-    debug_info = {
-        "search_results_found": sum(1 for _ in analyst.get("search", [])),
-        "sources_file": str(RUN_FILES.sources_raw()),
-        "errors": fact.get("flags", []),
-    }
-    debug_path = RUN_FILES.debug()
-    debug_path.write_text(json.dumps(debug_info, indent=2))
-    log.info(json.dumps({"event": "done", "run_id": RUN_ID, "artifacts": debug_info}))
-
-    sources_list = load_sources_jsonl()
+    sources_list = fact["sources"]  # already loaded by fact_checker; the JSONL is final by now
     sources_json_path = RUN_FILES.sources_raw()
     if sources_list or not sources_json_path.exists():
-        sources_json_path.write_text(json.dumps(sources_list, indent=2))
-        log.info(json.dumps({"event":"artifact_saved","name":"sources.raw.json","path":str(sources_json_path)}))
+        sources_json_path.write_bytes(orjson.dumps(sources_list, option=orjson.OPT_INDENT_2))
+        jlog(log, event="artifact_saved", name="sources.raw.json", path=str(sources_json_path))
 
+    # Summarize debug info (written once, after sources.raw.json exists)
     debug_info = {
-        "search_results_found": sum(1 for _ in analyst.get("search", [])),
+        "search_results_found": len(analyst.get("search") or []),
         "sources_file_jsonl": str(RUN_FILES.sources_final()),
         "sources_file_json": str(sources_json_path),
         "errors": fact.get("flags", []),
     }
     debug_path = RUN_FILES.debug()
-    debug_path.write_text(json.dumps(debug_info, indent=2))
-    log.info(json.dumps({"event":"artifact_saved","name":"debug.json","path":str(debug_path)}))
+    debug_path.write_bytes(orjson.dumps(debug_info, option=orjson.OPT_INDENT_2))
+    jlog(log, event="artifact_saved", name="debug.json", path=str(debug_path))
+    jlog(log, event="done", run_id=RUN_ID, artifacts=debug_info)
     return 0
 
 
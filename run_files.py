@@ -1,8 +1,11 @@
 # run_files.py
 """
-Centralized management of run artifact file names and paths.
+Centralized management of run artifact file names and paths,
+plus the atomic write helper shared by the artifact and cache writers.
 """
 from __future__ import annotations
+import os
+import threading
 import time
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -10,6 +13,12 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from pathlib import Path
 
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write via a per-writer temp file + rename so readers never see a partial file."""
+    tmp = path.with_suffix(path.suffix + f".tmp.{os.getpid()}.{threading.get_ident()}")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
 class RunFiles:
     """
     A class to manage all run artifact file names and paths consistently.
@@ -21,49 +30,70 @@ class RunFiles:
     def __init__(self, run_id: str, art_dir: Path):
         self.run_id = run_id
         self.art_dir = art_dir
+        self._prefix = f"{run_id}."
+        self._paths: dict[str, Path] = {}
+
+    def artifact(self, suffix: str) -> Path:
+        """art_dir/<run_id>.<suffix>, built once per suffix."""
+        p = self._paths.get(suffix)
+        if p is None:
+            p = self._paths[suffix] = self.art_dir / (self._prefix + suffix)
+        return p
     
     # Manifest file
     def manifest(self) -> Path:
         """Run metadata manifest file."""
-        return self.art_dir / f"{self.run_id}.manifest.json"
+        return self.artifact("manifest.json")
     
     # Source files
     def sources_final(self) -> Path:
         """Final source records in JSONL format."""
-        return self.art_dir / f"{self.run_id}.sources.final.jsonl"
+        return self.artifact("sources.final.jsonl")
     
     def sources_raw(self) -> Path:
         """Raw source data."""
-        return self.art_dir / f"{self.run_id}.sources.raw.json"
+        return self.artifact("sources.raw.json")
     
     # Macro Analyst files
     def macro_analyst_llm(self, timestamp: int | None = None) -> Path:
         """LLM calls from MacroAnalyst."""
         if timestamp is None:
             timestamp = int(time.time())
-        return self.art_dir / f"{self.run_id}.MacroAnalyst.{timestamp}.llm.json"
+        return self.art_dir / f"{self._prefix}MacroAnalyst.{timestamp}.llm.json"
     
     def macro_notes(self) -> Path:
         """Notes from MacroAnalyst."""
-        return self.art_dir / f"{self.run_id}.macro.notes.md"
+        return self.artifact("macro.notes.md")
+
+    def macro_notes_html(self) -> Path:
+        """MacroAnalyst notes pre-rendered to HTML."""
+        return self.artifact("macro.notes.html")
     
     # Fact Checker files
     def factcheck(self) -> Path:
         """Fact check results."""
-        return self.art_dir / f"{self.run_id}.factcheck.json"
+        return self.artifact("factcheck.json")
+
+    def factcheck_html(self) -> Path:
+        """Fact check text pre-rendered to HTML."""
+        return self.artifact("factcheck.html")
     
     # Executive Writer files
     def executive_writer_llm(self, timestamp: int | None = None) -> Path:
         """LLM calls from ExecutiveWriter."""
         if timestamp is None:
             timestamp = int(time.time())
-        return self.art_dir / f"{self.run_id}.ExecutiveWriter.{timestamp}.llm.json"
+        return self.art_dir / f"{self._prefix}ExecutiveWriter.{timestamp}.llm.json"
     
     def brief(self) -> Path:
         """Final executive brief."""
-        return self.art_dir / f"{self.run_id}.brief.md"
+        return self.artifact("brief.md")
+
+    def brief_html(self) -> Path:
+        """Executive brief pre-rendered to HTML."""
+        return self.artifact("brief.html")
     
     # Debug file
     def debug(self) -> Path:
         """Debug information."""
-        return self.art_dir / f"{self.run_id}.debug.json"
+        return self.artifact("debug.json")
@@ -1,8 +1,15 @@
 # run_logging.py
 from __future__ import annotations
-import os, uuid, time, json, logging, platform, subprocess
+import os, uuid, time, json, logging, platform, functools, threading, queue, atexit
 from pathlib import Path
 from contextlib import contextmanager
+from typing import Callable
+import orjson
+
+try:
+    import markdown  # optional: only needed to pre-render HTML for the visualizer
+except ImportError:
+    markdown = None
 
 # ---- Public API --------------------------------------------------------------
 
@@ -11,9 +18,17 @@ ART_DIR = Path(os.getenv("FEDRATE_ART_DIR", "runs"))
 ART_DIR.mkdir(parents=True, exist_ok=True)
 
 # Import RunFiles class
-from run_files import RunFiles
+from run_files import RunFiles, atomic_write_bytes
 RUN_FILES = RunFiles(RUN_ID, ART_DIR)
 
+def jlog(logger: logging.Logger, level: int = logging.INFO, **fields) -> None:
+    """
+    Log one structured event, e.g. jlog(log, event="search_ok", provider=p).
+    Fields ride on the record (extra=) and _JsonFormatter serializes them once.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, fields.get("event", ""), extra={"fields": fields})
+
 def init_logging(level: str | None = None) -> logging.Logger:
     lvl = getattr(logging, (level or os.getenv("LOGLEVEL", "INFO")).upper(), logging.INFO)
     logger = logging.getLogger("fedrate")
@@ -33,29 +48,93 @@ def write_manifest(extra_env_prefix: str = "FEDRATE_") -> Path:
         "platform": platform.platform(),
         "tz": time.tzname,
         "env_flags": {k: v for k, v in os.environ.items() if k.startswith(extra_env_prefix)},
-        "ts": _now_iso(),
+        "ts": iso_now(),
     }
     p = RUN_FILES.manifest()
-    p.write_text(json.dumps(manifest, indent=2))
-    logging.getLogger("fedrate").info(json.dumps({"event":"manifest_written","path":str(p)}))
+    p.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+    jlog(logging.getLogger("fedrate"), event="manifest_written", path=str(p))
     return p
 
+def _dump_json(obj) -> bytes:
+    """Indented JSON bytes via orjson; stdlib json for what orjson rejects (e.g. >64-bit ints)."""
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        return json.dumps(obj, indent=2).encode()
+
 def save_artifact(name: str, data) -> Path:
     """
     Save any JSON‑serializable object or raw str/bytes under runs/<RUN_ID>.<name>.
     """
-    p = ART_DIR / f"{RUN_ID}.{name}"
+    p = RUN_FILES.artifact(name)
     if isinstance(data, (dict, list)):
-        p.write_text(json.dumps(data, indent=2))
+        p.write_bytes(_dump_json(data))
     elif isinstance(data, (str, bytes)):
         mode = "wb" if isinstance(data, bytes) else "w"
         with open(p, mode) as f:
             f.write(data)
     else:
-        p.write_text(json.dumps({"repr": repr(data)}, indent=2))
-    logging.getLogger("fedrate").info(json.dumps({"event":"artifact_saved","name":name,"path":str(p)}))
+        p.write_bytes(_dump_json({"repr": repr(data)}))
+    jlog(logging.getLogger("fedrate"), event="artifact_saved", name=name, path=str(p))
+    return p
+
+def save_html_render(p: Path, text: str) -> Path | None:
+    """
+    Render markdown `text` once at write time so the visualizer can serve HTML as-is.
+    Rendering and the write both happen on the ArtifactWriter thread.
+    No-op (returns None) when the markdown package is not installed.
+    """
+    if markdown is None:
+        return None
+    ARTIFACT_WRITER.submit(p, lambda: markdown.markdown(text, extensions=["tables"]))
+    jlog(logging.getLogger("fedrate"), event="artifact_saved", name=p.name, path=str(p))
     return p
 
+class ArtifactWriter:
+    """
+    Single daemon thread that persists artifacts off the pipeline's critical path.
+    submit() returns immediately; `data` may be a zero-arg callable producing the
+    payload, so expensive rendering also runs on the writer thread.
+    flush() blocks until every queued write is done and returns the writes that
+    failed since the last flush, as (path, error) pairs.
+    """
+    def __init__(self):
+        self._q: queue.Queue[tuple[Path, str | bytes | Callable[[], str | bytes]]] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._failed: list[tuple[Path, str]] = []
+
+    def submit(self, p: Path, data: str | bytes | Callable[[], str | bytes]) -> Path:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+                self._thread.start()
+        self._q.put((p, data))
+        return p
+
+    def flush(self) -> list[tuple[Path, str]]:
+        self._q.join()
+        with self._lock:
+            failed, self._failed = self._failed, []
+        return failed
+
+    def _run(self) -> None:
+        while True:
+            p, data = self._q.get()
+            try:
+                if callable(data):
+                    data = data()
+                atomic_write_bytes(p, data if isinstance(data, bytes) else data.encode())
+            except Exception as e:
+                jlog(logging.getLogger("fedrate"), event="artifact_write_failed", path=str(p), err=str(e), level=logging.ERROR)
+                with self._lock:
+                    self._failed.append((p, str(e)))
+            finally:
+                self._q.task_done()
+
+ARTIFACT_WRITER = ArtifactWriter()
+atexit.register(ARTIFACT_WRITER.flush)
+
 def get_today(default_iso: str | None = None) -> str:
     """
     Use FEDRATE_TODAY if set; else 'default_iso' if provided; else current UTC date.
@@ -65,37 +144,87 @@ def get_today(default_iso: str | None = None) -> str:
         return env
     if default_iso:
         return default_iso
-    return _now_iso()[:10]
+    return iso_now()[:10]
 
 @contextmanager
 def timed_span(name: str):
-    t0 = time.time()
+    t0 = time.perf_counter_ns()
     try:
         yield
     finally:
-        dt = round(time.time() - t0, 3)
-        logging.getLogger("fedrate").info(json.dumps({"event":"timing","span":name,"secs":dt}))
+        dt = round((time.perf_counter_ns() - t0) / 1e9, 3)
+        jlog(logging.getLogger("fedrate"), event="timing", span=name, secs=dt)
 
 # ---- Internals ---------------------------------------------------------------
 
 class _JsonFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         base = {
-            "ts": _now_iso(),
+            "ts": iso_now(record.created),
             "lvl": record.levelname,
             "logger": record.name,
             "run_id": RUN_ID,
             "msg": record.getMessage(),
         }
+        fields = getattr(record, "fields", None)
+        if fields:
+            for k, v in fields.items():
+                base.setdefault(k, v)
         if record.exc_info:
             base["exc"] = self.formatException(record.exc_info)
-        return json.dumps(base)
+        return orjson.dumps(base, default=str).decode()
 
+@functools.lru_cache(maxsize=1)
 def _git_rev() -> str:
+    """Short HEAD sha, read straight from .git (no git subprocess)."""
     try:
-        return subprocess.check_output(["git","rev-parse","--short","HEAD"], text=True).strip()
+        git_dir = _find_git_dir(Path.cwd())
+        if git_dir is None:
+            return "nogit"
+        head = (git_dir / "HEAD").read_text().strip()
+        if head.startswith("ref: "):
+            ref = head[5:]
+            # a worktree's gitdir holds HEAD; branch refs and packed-refs live in its commondir
+            common = git_dir
+            commondir = git_dir / "commondir"
+            if commondir.exists():
+                common = (git_dir / commondir.read_text().strip()).resolve()
+            ref_file = next((f for f in (git_dir / ref, common / ref) if f.exists()), None)
+            if ref_file is not None:
+                head = ref_file.read_text().strip()
+            else:  # ref only present in packed-refs
+                head = ""
+                for line in (common / "packed-refs").read_text().splitlines():
+                    if line.endswith(" " + ref):
+                        head = line.split(" ", 1)[0]
+                        break
+        return head[:7] or "nogit"
     except Exception:
         return "nogit"
 
-def _now_iso() -> str:
-    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+def _find_git_dir(start: Path) -> Path | None:
+    """Nearest .git at or above `start`; follows the 'gitdir:' file used by worktrees."""
+    for d in (start, *start.parents):
+        g = d / ".git"
+        if g.is_dir():
+            return g
+        if g.is_file():
+            text = g.read_text().strip()
+            if text.startswith("gitdir: "):
+                return (d / text[8:]).resolve()
+    return None
+
+_ISO_FMT = "%Y-%m-%dT%H:%M:%SZ"
+
+# (second, formatted) for the last second seen; swapped as one tuple so threads never mix halves.
+_TS_CACHE: tuple[int, str] = (-1, "")
+
+def iso_now(ts: float | None = None) -> str:
+    """UTC ISO-8601 timestamp for `ts` (default: now), formatted at most once per second."""
+    global _TS_CACHE
+    sec = int(time.time() if ts is None else ts)
+    cached_sec, text = _TS_CACHE
+    if sec != cached_sec:
+        text = time.strftime(_ISO_FMT, time.gmtime(sec))
+        _TS_CACHE = (sec, text)
+    return text
@@ -1,4 +1,8 @@
 # serp_utils.py
+from io_clients import source_record, record_sources_jsonl
+
+# One context_block entry; entries are joined with a blank line between them.
+_CTX_TMPL = "[{i}] {title}\nURL: {url}\nSnippet: {snippet}\nProvider: {provider}\n"
 
 class SerpRecorder:
     """
@@ -33,10 +37,10 @@ class SerpRecorder:
         we scan deeper to still hit K when possible.
         Returns how many were recorded for this query.
         """
-        from io_clients import record_source_jsonl  # local import to avoid cycles
-
         taken = 0
         rank_in_query = 0
+        pending: list[dict] = []  # provenance rows, appended in one write after the scan
+        seen = self._seen_urls
         # single-pass scan: pick FIRST K unique + within run cap
         for item in results:
             url = (item.get("url") or "").strip()
@@ -45,15 +49,18 @@ class SerpRecorder:
             # skip if we've reached limits
             if taken >= self.top_k_per_query or not self._can_record_more():
                 break
-            # skip duplicates seen in prior queries
-            if url in self._seen_urls:
+            # skip duplicates seen in prior queries; set.add() doubles as the
+            # membership test, so an accepted URL costs one set probe
+            before = len(seen)
+            seen.add(url)
+            if len(seen) == before:
                 continue
 
             # unique → record it
             rank_in_query += 1
             provider = item.get("provider", "unknown")
             snippet = item.get("snippet", "")
-            record_source_jsonl(
+            pending.append(source_record(
                 claim=f"SERP:{query}",
                 url=url,
                 snippet=snippet,
@@ -63,9 +70,8 @@ class SerpRecorder:
                     "query": query,
                     "rank_in_query": rank_in_query
                 }
-            )
+            ))
 
-            self._seen_urls.add(url)
             self._agg_results.append({
                 "title": item.get("title") or "",
                 "url": url,
@@ -75,16 +81,19 @@ class SerpRecorder:
             taken += 1
             self._total_recorded += 1
 
+        record_sources_jsonl(pending)
         return taken
 
     # Convenience: build a short, readable context block for prompts
     def context_block(self, max_items: int = 8) -> str:
-        lines = []
-        for i, r in enumerate(self._agg_results[:max_items], start=1):
-            lines.append(
-                f"[{i}] {r.get('title') or '(no title)'}\n"
-                f"URL: {r.get('url','')}\n"
-                f"Snippet: {r.get('snippet','')}\n"
-                f"Provider: {r.get('provider','unknown')}\n"
+        lines = [
+            _CTX_TMPL.format(
+                i=i,
+                title=r.get("title") or "(no title)",
+                url=r.get("url", ""),
+                snippet=r.get("snippet", ""),
+                provider=r.get("provider", "unknown"),
             )
+            for i, r in enumerate(self._agg_results[:max_items], start=1)
+        ]
         return "\n".join(lines) if lines else "(no sources)"